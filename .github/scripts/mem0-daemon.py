@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Long-lived mem0 server shared by mem0-retrieve.py and mem0-save.py.
+
+Usage:
+    python mem0-daemon.py [socket_path]
+
+Loads the mem0 Memory (HuggingFace embedder + local Qdrant) once and
+serves newline-delimited JSON requests over a unix socket, so the
+embedder model is not reloaded by every script invocation in a job.
+
+Requests:
+    {"op": "search", "query": "...", "user_id": "...", "limit": 3}
+    {"op": "search_batch", "queries": [...], "user_id": "...", "limit": 3}
+    {"op": "add", "messages": [...], "user_id": "...", "metadata": {...},
+     "infer": true}
+
+Responses:
+    {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+
+Clients fall back to an in-process Memory when the socket is absent.
+"""
+
+import json
+import os
+import signal
+import socketserver
+import sys
+
+from mem0_common import MEM0_SOCKET, load_memory, search_batch
+
+
+class Mem0Handler(socketserver.StreamRequestHandler):
+    """Serve a single JSON request per connection."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            response = {"ok": True, "result": self.dispatch(request)}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response, default=str).encode() + b"\n")
+
+    def dispatch(self, request: dict):
+        memory = self.server.memory
+        op = request.get("op")
+        if op == "search":
+            return memory.search(
+                request["query"],
+                user_id=request.get("user_id", "goose-ci"),
+                limit=request.get("limit", 3),
+            )
+        if op == "search_batch":
+            return search_batch(
+                memory,
+                request["queries"],
+                user_id=request.get("user_id", "goose-ci"),
+                limit=request.get("limit", 3),
+            )
+        if op == "add":
+            return memory.add(
+                request["messages"],
+                user_id=request.get("user_id", "goose-ci"),
+                metadata=request.get("metadata"),
+                infer=request.get("infer", True),
+            )
+        if op == "ping":
+            return "pong"
+        raise ValueError(f"unknown op: {op!r}")
+
+
+class Mem0Server(socketserver.UnixStreamServer):
+    """Unix socket server holding the shared Memory instance.
+
+    Requests are handled serially — the embedded Qdrant store is not
+    safe for concurrent writers.
+    """
+
+    def __init__(self, socket_path: str, memory):
+        self.memory = memory
+        super().__init__(socket_path, Mem0Handler)
+
+
+def main():
+    socket_path = sys.argv[1] if len(sys.argv) > 1 else MEM0_SOCKET
+
+    try:
+        memory = load_memory()
+    except ImportError:
+        print("mem0 not installed, not starting memory daemon")
+        sys.exit(0)
+    except Exception as e:
+        print(f"WARNING: Failed to initialize mem0 ({type(e).__name__}): {e}")
+        sys.exit(0)  # non-fatal, clients fall back to in-process mem0
+
+    # A stale socket from a crashed daemon would make bind() fail.
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    # Exit cleanly on SIGTERM so the socket is removed and Qdrant is
+    # closed before the workflow archives /tmp/mem0-qdrant.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    server = Mem0Server(socket_path, memory)
+    print(f"mem0 daemon listening on {socket_path}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,68 +8,19 @@ Queries mem0 for past learnings related to the issue, common Go build
 errors, and implementation patterns. Writes formatted context to output_file.
 """
 
-import os
 import sys
 
-# mem0 is optional — if not installed or DB empty, produce empty context
-try:
-    from mem0 import Memory
-except ImportError:
-    print("mem0 not installed, skipping memory retrieval")
-    if len(sys.argv) >= 3:
-        with open(sys.argv[2], "w") as f:
-            f.write("")
-    sys.exit(0)
-
-# Model for mem0 LLM memory extraction — configurable via env var.
-# Defaults to a small/cheap model suitable for memory summarization.
-MEM0_MODEL = os.environ.get("MEM0_MODEL", "anthropic/claude-sonnet-4-20250514")
-
-
-def get_mem0_config():
-    """Build mem0 config using local embeddings + z.ai LLM."""
-    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
-    api_base = os.environ.get("ANTHROPIC_HOST", "https://api.anthropic.com")
-
-    config = {
-        "embedder": {
-            "provider": "huggingface",
-            "config": {
-                "model": "multi-qa-MiniLM-L6-cos-v1",
-            },
-        },
-        "vector_store": {
-            "provider": "qdrant",
-            "config": {
-                "path": "/tmp/mem0-qdrant",
-            },
-        },
-    }
-
-    # Use litellm with Anthropic proxy if API key available,
-    # otherwise skip LLM (mem0 will use default or fail gracefully)
-    if api_key:
-        config["llm"] = {
-            "provider": "litellm",
-            "config": {
-                "model": MEM0_MODEL,
-                "api_key": api_key,
-                "api_base": api_base,
-                "temperature": 0.1,
-                "max_tokens": 2000,
-            },
-        }
-
-    return config
-
+from mem0_common import DaemonMemory, load_memory, search_batch
 
 def retrieve_memories(issue_number: str) -> list[str]:
     """Query mem0 for memories relevant to this implementation run."""
+    # mem0 is optional — if not installed or DB empty, produce empty context
     try:
-        config = get_mem0_config()
-        memory = Memory.from_config(config)
+        memory = DaemonMemory.connect()
+        if memory is None:
+            memory = load_memory()
     except ImportError as e:
-        print(f"mem0 dependency missing: {e}")
+        print(f"mem0 not installed, skipping memory retrieval: {e}")
         return []
     except FileNotFoundError as e:
         print(f"mem0 database not found (first run?): {e}")
@@ -86,28 +37,39 @@ def retrieve_memories(issue_number: str) -> list[str]:
         "successful goose implementation patterns for wgmesh",
     ]
 
-    for query in queries:
-        try:
-            results = memory.search(
-                query,
-                user_id="goose-ci",
-                limit=3,
-            )
-            if isinstance(results, dict) and "results" in results:
-                result_list = results["results"]
-            elif isinstance(results, list):
-                result_list = results
-            else:
-                continue
-
-            for r in result_list:
-                text = r.get("memory", "") if isinstance(r, dict) else str(r)
-                if text and text not in memories:
-                    memories.append(text)
-        except Exception as e:
-            print(f"mem0 search failed for '{query}' ({type(e).__name__}): {e}")
+    try:
+        if isinstance(memory, DaemonMemory):
+            result_lists = memory.search_batch(queries, user_id="goose-ci", limit=3)
+        else:
+            result_lists = search_batch(memory, queries, user_id="goose-ci", limit=3)
+    except Exception as e:
+        print(f"WARNING: batched mem0 search failed ({type(e).__name__}): {e}")
+        result_lists = []
+        for query in queries:
+            try:
+                result_lists.append(memory.search(
+                    query,
+                    user_id="goose-ci",
+                    limit=3,
+                ))
+            except Exception as e:
+                print(f"mem0 search failed for '{query}' ({type(e).__name__}): {e}")
+
+    seen = set()
+    for results in result_lists:
+        if isinstance(results, dict) and "results" in results:
+            result_list = results["results"]
+        elif isinstance(results, list):
+            result_list = results
+        else:
             continue
 
+        for r in result_list:
+            text = r.get("memory", "") if isinstance(r, dict) else str(r)
+            if text and text not in seen:
+                seen.add(text)
+                memories.append(text)
+
     return memories
 
 
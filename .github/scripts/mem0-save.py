@@ -11,127 +11,234 @@ future runs to benefit from.
 All text is sanitized before storage to prevent leaking secrets.
 """
 
+import mmap
 import os
 import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from mem0_common import DaemonMemory, load_memory
+
+# google-re2 is optional — a linear-time engine with no backtracking
+# blowups on adversarial log input. Patterns below stay RE2-compatible
+# (no lookarounds, inline flags) so either engine can compile them.
 try:
-    from mem0 import Memory
+    import re2 as regex
 except ImportError:
-    print("mem0 not installed, skipping memory save")
-    sys.exit(0)
+    regex = re
+
+# Entries are deterministic summaries, so by default they are stored as-is
+# (mem0 infer=False) instead of paying an LLM round-trip per entry to
+# extract facts. Set MEM0_FAST_PATH=0 to use LLM extraction.
+MEM0_FAST_PATH = os.environ.get("MEM0_FAST_PATH", "1") != "0"
 
-# Model for mem0 LLM memory extraction — configurable via env var.
-MEM0_MODEL = os.environ.get("MEM0_MODEL", "anthropic/claude-sonnet-4-20250514")
+# Only the start of the log (where Goose states intent and files) and the
+# end (where build/test errors surface) are scanned, so the cost of saving
+# memories does not grow with the log size.
+LOG_HEAD_BYTES = 256 * 1024
+LOG_TAIL_BYTES = 2 * 1024 * 1024
 
 # Patterns that look like secrets — stripped before storing memories.
 _SECRET_PATTERNS = [
-    re.compile(r"sk-[A-Za-z0-9_-]{20,}"),          # OpenAI keys
-    re.compile(r"m0-[A-Za-z0-9_-]{20,}"),           # mem0 keys
-    re.compile(r"ghp_[A-Za-z0-9]{36,}"),             # GitHub PATs
-    re.compile(r"ghs_[A-Za-z0-9]{36,}"),             # GitHub App tokens
-    re.compile(r"github_pat_[A-Za-z0-9_]{20,}"),     # Fine-grained PATs
-    re.compile(r"Bearer\s+[A-Za-z0-9._-]{20,}"),     # Bearer tokens
-    re.compile(r"https?://[^@\s]+:[^@\s]+@\S+"),     # URLs with credentials
-    re.compile(r"ANTHROPIC_API_KEY=\S+"),             # Env var leaks
-    re.compile(r"OPENAI_API_KEY=\S+"),
-    re.compile(r"PUSH_TOKEN=\S+"),
-    re.compile(r"GITHUB_TOKEN=\S+"),
+    regex.compile(rb"sk-[A-Za-z0-9_-]{20,}"),          # OpenAI keys
+    regex.compile(rb"m0-[A-Za-z0-9_-]{20,}"),           # mem0 keys
+    regex.compile(rb"ghp_[A-Za-z0-9]{36,}"),             # GitHub PATs
+    regex.compile(rb"ghs_[A-Za-z0-9]{36,}"),             # GitHub App tokens
+    regex.compile(rb"github_pat_[A-Za-z0-9_]{20,}"),     # Fine-grained PATs
+    regex.compile(rb"Bearer\s+[A-Za-z0-9._-]{20,}"),     # Bearer tokens
+    regex.compile(rb"https?://[^@\s]+:[^@\s]+@\S+"),     # URLs with credentials
+    regex.compile(rb"ANTHROPIC_API_KEY=\S+"),             # Env var leaks
+    regex.compile(rb"OPENAI_API_KEY=\S+"),
+    regex.compile(rb"PUSH_TOKEN=\S+"),
+    regex.compile(rb"GITHUB_TOKEN=\S+"),
 ]
 
+# Literal substrings, one of which every _SECRET_PATTERNS match contains.
+_SECRET_HINTS = (
+    b"sk-", b"m0-", b"ghp_", b"ghs_", b"github_pat_", b"Bearer",
+    b"://", b"_KEY=", b"_TOKEN=",
+)
 
-def sanitize_text(text: str) -> str:
+
+def sanitize_text(text: bytes) -> bytes:
     """Remove potential secrets and sensitive data from text."""
+    # Most text holds no secrets; plain substring checks rule that out
+    # far faster than running every pattern.
+    if not any(hint in text for hint in _SECRET_HINTS):
+        return text
     for pattern in _SECRET_PATTERNS:
-        text = pattern.sub("[REDACTED]", text)
+        text = pattern.sub(b"[REDACTED]", text)
     return text
 
 
-def get_mem0_config():
-    """Build mem0 config using local embeddings + z.ai LLM."""
-    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
-    api_base = os.environ.get("ANTHROPIC_HOST", "https://api.anthropic.com")
+# Go build/test/vet diagnostics, matched in a single pass over the log.
+# Extraction patterns are bytes patterns so they run over the mapped log.
+_ERROR_PATTERN = regex.compile(
+    rb"(?P<build>\S+\.go:\d+:\d+: .+)"       # any .go file with line:col: message
+    rb"|--- FAIL: (?P<fail>\S+ \(.+?\))"     # "--- FAIL: TestFoo (0.00s)"
+    # go vet issues, which often wrap a build error on the same line
+    rb"|(?P<vet>vet: (?:.*?(?P<vet_build>\S+\.go:\d+:\d+: .+)|.+))"
+)
 
-    config = {
-        "embedder": {
-            "provider": "huggingface",
-            "config": {
-                "model": "multi-qa-MiniLM-L6-cos-v1",
-            },
-        },
-        "vector_store": {
-            "provider": "qdrant",
-            "config": {
-                "path": "/tmp/mem0-qdrant",
-            },
-        },
-    }
-
-    if api_key:
-        config["llm"] = {
-            "provider": "litellm",
-            "config": {
-                "model": MEM0_MODEL,
-                "api_key": api_key,
-                "api_base": api_base,
-                "temperature": 0.1,
-                "max_tokens": 2000,
-            },
-        }
+# Modified .go files and exported type/func declarations, in a single pass.
+_SUCCESS_PATTERN = regex.compile(
+    rb"(?i:(?:create|modify|edit|write|update)\w*\s+(?P<mod>\S+\.go)\b)"
+    rb"|(?m:^(?:type|func)\s+(?P<typ>[A-Z]\w+))"
+)
 
-    return config
+# Error mentions for the run summary — only ": error" or "Error:" to avoid
+# false positives from variable names/docs. Plain substrings, so they are
+# counted with memchr-based find() rather than the regex engine.
+_ERROR_MENTIONS = (b": error", b"Error:")
 
 
-def extract_build_errors(log_content: str) -> list[str]:
-    """Extract go build/test/vet error patterns from log."""
-    errors = []
+# Bounds on the extracted text placed in memory content, so pathological
+# log lines cannot inflate the LLM extraction prompt.
+MAX_ITEM_CHARS = 512
+MAX_DETAIL_CHARS = 2048
+
+
+def _decode(text: bytes) -> str:
+    """Decode extracted log text for the mem0 message content."""
+    return text.decode("utf-8", "replace")
+
+
+def _clip(text: str, limit: int) -> str:
+    """Truncate text to limit characters, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit] + "…"
 
-    # Go build errors: any .go file with line:col: message
-    build_errors = re.findall(
-        r"(\S+\.go:\d+:\d+: .+)", log_content
-    )
-    for err in build_errors[:10]:  # cap at 10
-        errors.append(f"Build error: {sanitize_text(err)}")
 
-    # Go test failures: "--- FAIL: TestFoo (0.00s)"
-    test_failures = re.findall(r"--- FAIL: (\S+ \(.+?\))", log_content)
-    for fail in test_failures[:10]:
-        errors.append(f"Test failure: {fail}")
+def _join_clipped(items: list[bytes]) -> str:
+    """Sanitize, decode and join extracted items within the size bounds.
 
-    # Go vet issues
-    vet_issues = re.findall(r"(vet: .+)", log_content)
-    for issue in vet_issues[:5]:
-        errors.append(f"Vet issue: {sanitize_text(issue)}")
+    Items are sanitized before clipping so a truncated secret cannot slip
+    past the redaction patterns.
+    """
+    text = "; ".join(
+        _clip(_decode(sanitize_text(item)), MAX_ITEM_CHARS) for item in items
+    )
+    return _clip(text, MAX_DETAIL_CHARS)
+
+
+def scan_log(
+    pattern,
+    log_content: bytes,
+    caps: dict,
+    aliases=None,
+    unique: bool = False,
+) -> dict:
+    """Bucket matches of a fused pattern by the named groups that fired.
+
+    caps maps each bucket name to the maximum number of matches kept
+    (None for no limit); aliases maps extra group names onto a bucket.
+    With unique, repeated values are skipped so caps count distinct
+    matches. Values are kept as bytes slices of the log. Scanning stops
+    early once every bucket is full.
+    """
+    aliases = aliases or {}
+    # re2 reports bytes group names for bytes patterns — dispatch by index.
+    group_buckets = {}
+    for group, index in pattern.groupindex.items():
+        if isinstance(group, bytes):
+            group = group.decode()
+        group_buckets[index] = aliases.get(group, group)
+
+    found = {name: [] for name in caps}
+    seen = {name: set() for name in caps}
+    bounded = None not in caps.values()
+    open_buckets = len(caps)
+    for match in pattern.finditer(log_content):
+        for index, value in enumerate(match.groups(), 1):
+            if value is None:
+                continue
+            name = group_buckets[index]
+            bucket, cap = found[name], caps[name]
+            if cap is not None and len(bucket) >= cap:
+                continue
+            if unique:
+                if value in seen[name]:
+                    continue
+                seen[name].add(value)
+            bucket.append(value)
+            if len(bucket) == cap:
+                open_buckets -= 1
+        if bounded and open_buckets == 0:
+            break
+    return found
+
+
+def count_occurrences(buf: bytes, needle: bytes) -> int:
+    """Count non-overlapping occurrences of needle in bytes or an mmap.
+
+    mmap has no count(), so this walks find() — each call is a C scan.
+    """
+    count = 0
+    pos = buf.find(needle)
+    while pos != -1:
+        count += 1
+        pos = buf.find(needle, pos + len(needle))
+    return count
+
+
+def read_log_window(
+    path: str,
+    head: int = LOG_HEAD_BYTES,
+    tail: int = LOG_TAIL_BYTES,
+) -> tuple[bytes, int]:
+    """Return the head and tail of a log file, plus its full size.
+
+    Small logs are read whole. For larger logs the two windows are sliced
+    from a read-only mapping and joined with a newline, each trimmed to
+    whole lines so no truncated match is reported at the seams.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= head + tail:
+            return f.read(), size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            head_end = buf.rfind(b"\n", 0, head) + 1 or head
+            tail_start = buf.find(b"\n", size - tail) + 1 or size - tail
+            return buf[:head_end] + b"\n" + buf[tail_start:], size
+
+
+def extract_build_errors(log_content: bytes) -> list[bytes]:
+    """Extract go build/test/vet error patterns from log."""
+    found = scan_log(
+        _ERROR_PATTERN,
+        log_content,
+        {"build": 10, "fail": 10, "vet": 5},
+        aliases={"vet_build": "build"},
+    )
 
+    errors = [b"Build error: " + sanitize_text(err) for err in found["build"]]
+    errors += [b"Test failure: " + fail for fail in found["fail"]]
+    errors += [b"Vet issue: " + sanitize_text(issue) for issue in found["vet"]]
     return errors
 
 
-def extract_success_patterns(log_content: str) -> list[str]:
+def extract_success_patterns(log_content: bytes) -> list[bytes]:
     """Extract patterns from successful runs."""
     patterns = []
-
-    # Files that were modified — match any .go file path
-    modified_files = re.findall(
-        r"(?:create|modify|edit|write|update)\w*\s+(\S+\.go)\b",
+    found = scan_log(
+        _SUCCESS_PATTERN,
         log_content,
-        re.IGNORECASE,
+        {"mod": 10, "typ": 15},
+        unique=True,
     )
+
+    # Files that were modified — match any .go file path
+    modified_files = found["mod"]
     if modified_files:
-        unique = list(dict.fromkeys(modified_files))[:10]
         patterns.append(
-            f"Modified files: {', '.join(unique)}"
+            b"Modified files: " + b", ".join(modified_files)
         )
 
     # Type/function declarations only (lines starting with keyword)
-    type_refs = re.findall(
-        r"^(?:type|func)\s+([A-Z]\w+)",
-        log_content,
-        re.MULTILINE,
-    )
+    type_refs = found["typ"]
     if type_refs:
-        unique = list(dict.fromkeys(type_refs))[:15]
         patterns.append(
-            f"Types/functions used: {', '.join(unique)}"
+            b"Types/functions used: " + b", ".join(type_refs)
         )
 
     return patterns
@@ -139,17 +246,30 @@ def extract_success_patterns(log_content: str) -> list[str]:
 
 def build_memories(
     issue_number: str,
-    log_content: str,
+    log_content: bytes,
     outcome: str,
+    log_size: int = None,
 ) -> list[dict]:
-    """Build memory entries from the run."""
+    """Build memory entries from the run.
+
+    Each entry carries the conversation for mem0's LLM fact extraction
+    and an equivalent ready-made "text" for storing it verbatim.
+    log_size is the size of the full log when log_content is only a
+    window of it.
+    """
     memories = []
 
     if outcome == "failure":
         errors = extract_build_errors(log_content)
         if errors:
-            error_text = sanitize_text("; ".join(errors[:5]))
+            error_text = _join_clipped(errors[:5])
+            lesson = (
+                f"Issue #{issue_number} implementation failed. "
+                f"Key errors to avoid next time: {error_text}. "
+                "Always read source files before using types."
+            )
             memories.append({
+                "text": lesson,
                 "messages": [
                     {
                         "role": "user",
@@ -158,14 +278,7 @@ def build_memories(
                             f"Errors: {error_text}"
                         ),
                     },
-                    {
-                        "role": "assistant",
-                        "content": (
-                            f"Issue #{issue_number} implementation failed. "
-                            f"Key errors to avoid next time: {error_text}. "
-                            "Always read source files before using types."
-                        ),
-                    },
+                    {"role": "assistant", "content": lesson},
                 ],
                 "metadata": {
                     "issue": issue_number,
@@ -177,8 +290,14 @@ def build_memories(
     elif outcome == "success":
         patterns = extract_success_patterns(log_content)
         if patterns:
-            pattern_text = sanitize_text("; ".join(patterns))
+            pattern_text = _join_clipped(patterns)
+            lesson = (
+                f"Issue #{issue_number} was implemented successfully. "
+                f"Effective patterns: {pattern_text}. "
+                "Reuse these approaches for similar tasks."
+            )
             memories.append({
+                "text": lesson,
                 "messages": [
                     {
                         "role": "user",
@@ -187,14 +306,7 @@ def build_memories(
                             f"Patterns: {pattern_text}"
                         ),
                     },
-                    {
-                        "role": "assistant",
-                        "content": (
-                            f"Issue #{issue_number} was implemented successfully. "
-                            f"Effective patterns: {pattern_text}. "
-                            "Reuse these approaches for similar tasks."
-                        ),
-                    },
+                    {"role": "assistant", "content": lesson},
                 ],
                 "metadata": {
                     "issue": issue_number,
@@ -203,22 +315,21 @@ def build_memories(
                 },
             })
 
-    # Always save a run summary — count only lines containing ": error"
-    # or "Error:" to avoid false positives from variable names/docs.
-    log_size = len(log_content)
-    error_count = len(re.findall(
-        r"(?::\s*error\b|Error:)", log_content
-    ))
+    # Always save a run summary
+    if log_size is None:
+        log_size = len(log_content)
+    error_count = sum(
+        count_occurrences(log_content, needle) for needle in _ERROR_MENTIONS
+    )
+    summary = (
+        f"Run summary for issue #{issue_number}: "
+        f"outcome={outcome}, log_size={log_size}, "
+        f"error_mentions={error_count}"
+    )
     memories.append({
+        "text": summary,
         "messages": [
-            {
-                "role": "user",
-                "content": (
-                    f"Run summary for issue #{issue_number}: "
-                    f"outcome={outcome}, log_size={log_size}, "
-                    f"error_mentions={error_count}"
-                ),
-            },
+            {"role": "user", "content": summary},
             {
                 "role": "assistant",
                 "content": (
@@ -237,6 +348,46 @@ def build_memories(
     return memories
 
 
+class SerializedVectorStore:
+    """Forward calls to a vector store one at a time.
+
+    The embedded Qdrant store is not safe for concurrent writers. Wrapping
+    mem0's vector store lets concurrent adds overlap their LLM extraction
+    calls while every search and write on the store still runs alone.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._store, name)
+        if not callable(attr):
+            return attr
+
+        def serialized(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return serialized
+
+
+def save_entry(memory, entry: dict):
+    """Store one memory entry, verbatim or through LLM fact extraction."""
+    if MEM0_FAST_PATH:
+        return memory.add(
+            [{"role": "assistant", "content": entry["text"]}],
+            user_id="goose-ci",
+            metadata=entry["metadata"],
+            infer=False,
+        )
+    return memory.add(
+        entry["messages"],
+        user_id="goose-ci",
+        metadata=entry["metadata"],
+    )
+
+
 def main():
     if len(sys.argv) < 4:
         print(
@@ -253,33 +404,44 @@ def main():
         print(f"Invalid outcome: {outcome}. Must be 'success' or 'failure'")
         sys.exit(1)
 
-    # Read log
+    # Only a bounded head/tail window of the log is scanned, as bytes; the
+    # mapping means pages are loaded lazily and only the final message
+    # text is decoded.
     try:
-        with open(log_file) as f:
-            log_content = f.read()
+        log_content, log_size = read_log_window(log_file)
     except FileNotFoundError:
         print(f"Log file not found: {log_file}")
-        log_content = f"No log available for issue #{issue_number}"
+        log_content = f"No log available for issue #{issue_number}".encode()
+        log_size = len(log_content)
 
-    # Initialize mem0
+    # Initialize mem0 — reuse the daemon's loaded model when it is running
     try:
-        config = get_mem0_config()
-        memory = Memory.from_config(config)
+        memory = DaemonMemory.connect()
+        if memory is None:
+            memory = load_memory()
+    except ImportError:
+        print("mem0 not installed, skipping memory save")
+        sys.exit(0)
     except Exception as e:
         print(f"WARNING: Failed to initialize mem0 ({type(e).__name__}): {e}")
         sys.exit(0)  # non-fatal
 
-    # Build and save memories
-    entries = build_memories(issue_number, log_content, outcome)
-    saved = 0
+    # Build and save memories. With LLM extraction each add waits on
+    # upstream calls, so in-process adds run concurrently, with the vector
+    # store serialized underneath. Verbatim adds are a local embed + upsert,
+    # and the daemon serves one request at a time, so both use one worker.
+    entries = build_memories(issue_number, log_content, outcome, log_size)
+    workers = 1
+    if not MEM0_FAST_PATH and not isinstance(memory, DaemonMemory):
+        memory.vector_store = SerializedVectorStore(memory.vector_store)
+        workers = len(entries)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(save_entry, memory, entry) for entry in entries]
 
-    for entry in entries:
+    saved = 0
+    for future in futures:
         try:
-            memory.add(
-                entry["messages"],
-                user_id="goose-ci",
-                metadata=entry["metadata"],
-            )
+            future.result()
             saved += 1
         except Exception as e:
             print(f"Failed to save memory ({type(e).__name__}): {e}")
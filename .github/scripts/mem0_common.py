@@ -0,0 +1,236 @@
+"""Shared mem0 setup for the mem0-*.py scripts.
+
+Holds the mem0 config, the client for mem0-daemon.py, and the batched
+search used both in-process and by the daemon.
+"""
+
+import json
+import os
+import socket
+
+# Model for mem0 LLM memory extraction — configurable via env var.
+# Defaults to a small/cheap model suitable for memory summarization.
+MEM0_MODEL = os.environ.get("MEM0_MODEL", "anthropic/claude-sonnet-4-20250514")
+
+# OpenAI-compatible text-embeddings-inference endpoint serving the
+# embedder model, e.g. http://localhost:8080/v1. Unset = embed in-process.
+MEM0_EMBEDDER_URL = os.environ.get("MEM0_EMBEDDER_URL", "")
+
+# Unix socket of mem0-daemon.py — used instead of loading mem0 in-process
+# when the daemon is running.
+MEM0_SOCKET = os.environ.get("MEM0_SOCKET", "/tmp/mem0-daemon.sock")
+
+# Seconds to wait for a daemon reply. A ping only checks that the daemon
+# answers; an add may wait on LLM fact extraction.
+DAEMON_PING_TIMEOUT = 2
+DAEMON_REQUEST_TIMEOUT = 120
+DAEMON_ADD_TIMEOUT = 600
+
+
+def get_mem0_config():
+    """Build mem0 config using local embeddings + z.ai LLM."""
+    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+    api_base = os.environ.get("ANTHROPIC_HOST", "https://api.anthropic.com")
+
+    config = {
+        "embedder": {
+            "provider": "huggingface",
+            "config": {
+                "model": "multi-qa-MiniLM-L6-cos-v1",
+            },
+        },
+        # Embedded Qdrant is brute-force (no HNSW index or optimizer to
+        # tune) and ignores on_disk for vectors: local mode holds them in
+        # memory and persists them to SQLite under path. The one effect of
+        # on_disk is that mem0 no longer wipes path on startup, which it
+        # does otherwise, so the store restored by the workflow survives.
+        # Scalar quantization is not available here either: local mode
+        # scores exact fp32 vectors and mem0's qdrant config has no
+        # quantization option. Revisit both if the store moves to a
+        # Qdrant server.
+        "vector_store": {
+            "provider": "qdrant",
+            "config": {
+                "path": "/tmp/mem0-qdrant",
+                "on_disk": True,
+                "embedding_model_dims": 384,  # multi-qa-MiniLM-L6-cos-v1
+            },
+        },
+    }
+
+    # Use a text-embeddings-inference server when one is running, so the
+    # model is loaded once by the server instead of by every process.
+    if MEM0_EMBEDDER_URL:
+        config["embedder"] = {
+            "provider": "openai",
+            "config": {
+                "model": "multi-qa-MiniLM-L6-cos-v1",
+                "openai_base_url": MEM0_EMBEDDER_URL,
+                "api_key": "unused",  # TEI does not authenticate
+                "embedding_dims": 384,
+            },
+        }
+
+    # Use litellm with Anthropic proxy if API key available,
+    # otherwise skip LLM (mem0 will use default or fail gracefully)
+    if api_key:
+        config["llm"] = {
+            "provider": "litellm",
+            "config": {
+                "model": MEM0_MODEL,
+                "api_key": api_key,
+                "api_base": api_base,
+                "temperature": 0.1,
+                "max_tokens": 2000,
+            },
+        }
+
+    return config
+
+
+def load_memory():
+    """Import mem0 and build an in-process Memory from get_mem0_config().
+
+    mem0 pulls in torch, transformers and qdrant-client, so it is only
+    imported here — after the scripts have validated their arguments and
+    found no daemon to talk to. Raises ImportError if mem0 is missing.
+    """
+    # Quieten transformers and keep the tokenizers library from spawning
+    # its thread pool for the handful of short texts embedded per run.
+    os.environ.setdefault("TRANSFORMERS_NO_ADVISORY_WARNINGS", "1")
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    from mem0 import Memory
+
+    return Memory.from_config(get_mem0_config())
+
+
+class DaemonMemory:
+    """Memory-compatible client for a running mem0-daemon.py."""
+
+    def __init__(self, socket_path: str = MEM0_SOCKET):
+        self.socket_path = socket_path
+
+    @classmethod
+    def connect(cls, socket_path: str = MEM0_SOCKET):
+        """Return a client if the daemon answers a ping, otherwise None.
+
+        A missing socket, a wedged daemon and a garbled or empty reply all
+        count as no daemon, so callers fall back to in-process mem0.
+        """
+        client = cls(socket_path)
+        try:
+            client._request({"op": "ping"}, timeout=DAEMON_PING_TIMEOUT)
+        except (OSError, ValueError):  # includes timeouts and bad JSON
+            return None
+        return client
+
+    def _request(self, request: dict, timeout: float = DAEMON_REQUEST_TIMEOUT):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        if not line:
+            raise ConnectionError("mem0 daemon closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(f"mem0 daemon: {response.get('error')}")
+        return response["result"]
+
+    def search(self, query: str, user_id: str, limit: int = 3):
+        return self._request({
+            "op": "search",
+            "query": query,
+            "user_id": user_id,
+            "limit": limit,
+        })
+
+    def search_batch(self, queries: list[str], user_id: str, limit: int = 3):
+        return self._request({
+            "op": "search_batch",
+            "queries": queries,
+            "user_id": user_id,
+            "limit": limit,
+        })
+
+    def add(
+        self,
+        messages: list[dict],
+        user_id: str,
+        metadata: dict = None,
+        infer: bool = True,
+    ):
+        return self._request({
+            "op": "add",
+            "messages": messages,
+            "user_id": user_id,
+            "metadata": metadata,
+            "infer": infer,
+        }, timeout=DAEMON_ADD_TIMEOUT)
+
+
+def embed_batch(memory, texts: list[str]) -> list[list[float]]:
+    """Embed several texts with a single call to mem0's embedder.
+
+    Handles both the in-process SentenceTransformer model and the
+    OpenAI-compatible client used for a text-embeddings-inference server.
+    """
+    embedder = memory.embedding_model
+    model = getattr(embedder, "model", None)
+    if hasattr(model, "encode"):
+        return model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+        ).tolist()
+    response = embedder.client.embeddings.create(
+        input=texts,
+        model=embedder.config.model,
+    )
+    return [item.embedding for item in response.data]
+
+
+def query_vector_store(memory, vectors: list, user_id: str, limit: int) -> list:
+    """Run several vector searches against mem0's collection in one request.
+
+    Uses Qdrant's batch query API directly, so all searches share a single
+    call instead of one vector_store.search per query.
+    """
+    from qdrant_client import models
+
+    user_filter = models.Filter(must=[
+        models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id)),
+    ])
+    responses = memory.vector_store.client.query_batch_points(
+        collection_name=memory.vector_store.collection_name,
+        requests=[
+            models.QueryRequest(
+                query=vector,
+                filter=user_filter,
+                limit=limit,
+                with_payload=True,
+            )
+            for vector in vectors
+        ],
+    )
+    return [
+        [
+            {"memory": (point.payload or {}).get("data", ""), "score": point.score}
+            for point in response.points
+        ]
+        for response in responses
+    ]
+
+
+def search_batch(memory, queries: list[str], user_id: str, limit: int) -> list:
+    """Search mem0 for several queries with one batched embedding pass.
+
+    Bypasses Memory.search, which embeds and searches one query per call:
+    all queries are encoded in a single forward pass and looked up in a
+    single Qdrant batch request. Returns one result list per query, shaped
+    like the "results" of Memory.search.
+    """
+    vectors = embed_batch(memory, queries)
+    return query_vector_store(memory, vectors, user_id, limit)
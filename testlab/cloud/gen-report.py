@@ -11,242 +11,427 @@ a self-contained HTML report with:
   - Data plane metrics (transfer, iperf, MTU results)
   - Duration breakdown per test
   - Tier summary statistics
+
+Runs on CPython 3.10+ or PyPy3. orjson and msgspec speed up parsing on
+CPython when installed; without them, as on PyPy, which neither
+supports, the stdlib json path is used. It is plain Python that PyPy's
+JIT handles well, so `pypy3 gen-report.py ...` pays off for traces of
+hundreds of thousands of events, where JIT warm-up no longer dominates.
 """
 
+import functools
+import gc
+import html
 import json
+import math
+import mmap
+import os
 import sys
+import tempfile
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-
-
-def load_events(path: str) -> list[dict]:
+from typing import Any
+
+# orjson is optional — it parses the NDJSON trace several times faster.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    def json_loads(line: bytes):
+        # Decoding first is faster than json.loads' own encoding detection.
+        return json.loads(line.decode())
+
+# msgspec is optional — when installed, trace lines are decoded straight
+# into Event structs without building an intermediate dict per event.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Fields of a trace event read by the report, with defaults for the ones
+# emit_event() does not write for every event type. Decoded events always
+# carry every field, so the report reads them without lookups or .get();
+# a None default marks a field whose absence makes the report fall back
+# to another value, e.g. a test without "duration" uses its end - start.
+# A field holding JSON null decodes to None too, so it takes the same
+# fallback as an absent one; emit_event() never writes null.
+# emit_event() writes every value but ts as a string, yet values are typed
+# Any: the report renders whatever a trace holds through str(), and a
+# stricter type would make msgspec drop events the json path keeps.
+EVENT_FIELDS = [
+    ("ts", float),
+    ("type", str, ""),
+    ("name", Any, ""),
+    ("tier", Any, "?"),
+    ("result", Any, None),
+    ("duration", Any, None),
+    ("params", Any, ""),
+    ("tests", Any, "?"),
+    ("mbps", Any, None),
+    ("size_mb", Any, None),
+    ("payload", Any, None),
+]
+
+# Test results map to a small index at parse time, which selects the badge
+# and bar color by position; any other result uses the last color.
+RESULT_INDEX = {"PASS": 0, "FAIL": 1, "SKIP": 2}
+OTHER_RESULT = 3
+RESULT_COLORS = ("#22c55e", "#ef4444", "#eab308", "#6b7280")
+
+if msgspec is not None:
+    Event = msgspec.defstruct("Event", EVENT_FIELDS, gc=False)
+    _decoder = msgspec.json.Decoder(Event)
+    decode_event = _decoder.decode
+    decode_events = _decoder.decode_lines
+else:
+    # The decoded dict becomes the instance __dict__ as is, and absent
+    # fields fall back to the defaults held as class attributes.
+    Event = type("Event", (), {
+        field[0]: field[2] for field in EVENT_FIELDS if len(field) == 3
+    })
+
+    def decode_event(line: bytes) -> Event:
+        ev = json_loads(line)
+        if not isinstance(ev, dict) or "ts" not in ev:
+            raise ValueError("not a trace event")
+        event = Event.__new__(Event)
+        event.__dict__ = ev
+        return event
+
+
+# Report entries built from the trace by bucket_events(). Text fields hold
+# HTML-escaped trace values, ready to interpolate into the report.
+@dataclass(slots=True)
+class TimelineEntry:
+    id: str
+    tier: str
+    start: float
+    end: float
+    duration: float
+    result: str
+    result_idx: int
+
+
+@dataclass(slots=True)
+class ChaosEntry:
+    ts: float
+    type: str
+    node: str
+    params: str
+    tier: str
+
+
+@dataclass(slots=True)
+class TierEntry:
+    name: str
+    start: float
+    end: float
+    duration: float
+    tests: str
+
+
+@dataclass(slots=True)
+class MetricEntry:
+    ts: float
+    type: str
+    name: str
+    tier: str
+    result: str
+    detail: str
+
+
+def load_events(path: str) -> list[Event]:
     """Load NDJSON events from trace file."""
-    events = []
-    with open(path) as f:
+    with open(path, "rb") as f:
+        # msgspec decodes the whole memory-mapped trace in one call, with
+        # no copy per line. A malformed line fails the batch, and the
+        # loop below then decodes line by line, skipping bad lines.
+        if msgspec is not None and os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    return decode_events(mm)
+                except ValueError:
+                    pass
+            f.seek(0)
+
+        events = []
         for line in f:
-            line = line.strip()
-            if not line:
+            if line == b"\n":
                 continue
             try:
-                events.append(json.loads(line))
-            except json.JSONDecodeError:
+                events.append(decode_event(line))
+            except ValueError:  # malformed JSON, invalid UTF-8 or not an event
                 continue
     return events
 
 
-def build_test_timeline(events: list[dict]) -> list[dict]:
-    """Pair test_start/test_end events into timeline entries."""
-    starts = {}
+# Tier names and event types repeat on nearly every entry. Escaping each
+# distinct value once also lets all the entries share one string for it.
+@functools.lru_cache(maxsize=1024)
+def _escape_repeated(value: str) -> str:
+    return html.escape(value, quote=False)
+
+
+def bucket_events(events: list[Event]) -> tuple:
+    """Sort events into the report sections in a single pass.
+
+    Pairs test_start/test_end events into timeline entries and
+    tier_start/tier_end events into tier timings, extracts chaos
+    apply/clear events and data plane verification results, and tracks
+    the test count per result index and the time range covered by the
+    timeline.
+
+    Trace values are converted to str and HTML-escaped here, once per
+    entry, so the renderers can interpolate them as is. The conversion
+    keeps numbers written by hand-edited or foreign traces rendering as
+    they did. Fields that also appear in attributes are escaped with
+    quote=True.
+
+    Returns (timeline, chaos, data_metrics, tiers, result_counts, t_min,
+    t_max); t_min and t_max stay at +inf/-inf when the timeline is empty.
+    """
+    test_starts = {}
+    tier_starts = {}
     timeline = []
-    for ev in events:
-        if ev["type"] == "test_start":
-            starts[ev["name"]] = ev
-        elif ev["type"] == "test_end":
-            start_ev = starts.pop(ev["name"], None)
-            start_ts = start_ev["ts"] if start_ev else ev["ts"]
-            timeline.append({
-                "id": ev["name"],
-                "test_name": ev.get("name", ""),
-                "tier": ev.get("tier", "?"),
-                "start": start_ts,
-                "end": ev["ts"],
-                "duration": float(ev.get("duration", ev["ts"] - start_ts)),
-                "result": ev.get("result", "?"),
-            })
-    return timeline
-
-
-def build_chaos_events(events: list[dict]) -> list[dict]:
-    """Extract chaos apply/clear events."""
     chaos = []
-    for ev in events:
-        if ev["type"] in ("chaos_apply", "chaos_clear"):
-            chaos.append({
-                "ts": ev["ts"],
-                "type": ev["type"],
-                "node": ev["name"],
-                "chaos_type": ev.get("type_param", ev.get("type", "")),
-                "params": ev.get("params", ""),
-                "tier": ev.get("tier", "?"),
-            })
-    return chaos
-
-
-def build_data_plane_metrics(events: list[dict]) -> list[dict]:
-    """Extract data plane verification results."""
-    metrics = []
-    for ev in events:
-        if ev["type"].startswith("data_"):
-            metrics.append({
-                "ts": ev["ts"],
-                "type": ev["type"],
-                "name": ev["name"],
-                "tier": ev.get("tier", "?"),
-                **{k: v for k, v in ev.items()
-                   if k not in ("ts", "type", "name", "tier")},
-            })
-    return metrics
-
-
-def build_tier_summary(events: list[dict]) -> list[dict]:
-    """Extract tier start/end timing."""
-    starts = {}
+    data_metrics = []
     tiers = []
+    result_counts = [0] * len(RESULT_COLORS)
+    t_min = math.inf
+    t_max = -math.inf
+    esc = html.escape
+    esc_repeated = _escape_repeated
+
     for ev in events:
-        if ev["type"] == "tier_start":
-            starts[ev["name"]] = ev
-        elif ev["type"] == "tier_end":
-            start_ev = starts.pop(ev["name"], None)
-            start_ts = start_ev["ts"] if start_ev else ev["ts"]
-            tiers.append({
-                "name": ev["name"],
-                "start": start_ts,
-                "end": ev["ts"],
-                "duration": ev["ts"] - start_ts,
-                "tests": start_ev.get("tests", "?") if start_ev else "?",
-            })
-    return tiers
+        etype = ev.type
+        if etype == "test_start":
+            test_starts[ev.name] = ev
+        elif etype == "test_end":
+            start_ev = test_starts.pop(ev.name, None)
+            start_ts = start_ev.ts if start_ev else ev.ts
+            result = str(ev.result) if ev.result is not None else "?"
+            result_idx = RESULT_INDEX.get(result, OTHER_RESULT)
+            result_counts[result_idx] += 1
+            timeline.append(TimelineEntry(
+                esc(str(ev.name)),
+                esc_repeated(str(ev.tier)),
+                start_ts,
+                ev.ts,
+                float(ev.duration if ev.duration is not None else ev.ts - start_ts),
+                # Known results are plain words with nothing to escape.
+                result if result_idx != OTHER_RESULT else esc(result),
+                result_idx,
+            ))
+            t_min = min(t_min, start_ts, ev.ts)
+            t_max = max(t_max, start_ts, ev.ts)
+        elif etype in ("chaos_apply", "chaos_clear"):
+            chaos.append(ChaosEntry(
+                ev.ts,
+                etype,
+                esc(str(ev.name), quote=False),
+                esc(str(ev.params), quote=False),
+                esc_repeated(str(ev.tier)),
+            ))
+        elif etype == "tier_start":
+            tier_starts[ev.name] = ev
+        elif etype == "tier_end":
+            start_ev = tier_starts.pop(ev.name, None)
+            start_ts = start_ev.ts if start_ev else ev.ts
+            tiers.append(TierEntry(
+                esc(str(ev.name), quote=False),
+                start_ts,
+                ev.ts,
+                ev.ts - start_ts,
+                esc(str(start_ev.tests), quote=False) if start_ev else "?",
+            ))
+        elif etype.startswith("data_"):
+            # Transfer and MTU checks report a result, iperf a bandwidth;
+            # the detail is the transfer size, MTU payload or iperf duration.
+            result = ev.result if ev.result is not None else ev.mbps
+            detail = ev.size_mb
+            if detail is None:
+                detail = ev.payload if ev.payload is not None else ev.duration
+            data_metrics.append(MetricEntry(
+                ev.ts,
+                esc_repeated(etype),
+                esc(str(ev.name), quote=False),
+                esc_repeated(str(ev.tier)),
+                esc(str(result), quote=False) if result is not None else "-",
+                esc(str(detail), quote=False) if detail is not None else "-",
+            ))
+
+    return timeline, chaos, data_metrics, tiers, result_counts, t_min, t_max
 
 
 def format_duration(seconds: float) -> str:
     """Format seconds as human-readable string."""
     if seconds < 60:
         return f"{seconds:.0f}s"
-    m, s = divmod(int(seconds), 60)
+    return _format_whole_duration(int(seconds))
+
+
+# Durations of a minute or more are shown in whole seconds and repeat a
+# lot across rows. The cache is bounded so long traces cannot grow it
+# without limit.
+@functools.lru_cache(maxsize=4096)
+def _format_whole_duration(seconds: int) -> str:
+    m, s = divmod(seconds, 60)
     if m < 60:
         return f"{m}m{s:02d}s"
     h, m = divmod(m, 60)
     return f"{h}h{m:02d}m{s:02d}s"
 
 
-def generate_html(events: list[dict]) -> str:
-    """Generate self-contained HTML report."""
-    timeline = build_test_timeline(events)
-    chaos = build_chaos_events(events)
-    data_metrics = build_data_plane_metrics(events)
-    tiers = build_tier_summary(events)
-
-    if not timeline:
-        return "<html><body><h1>No test events found</h1></body></html>"
-
-    # Calculate global time range
-    all_times = [t["start"] for t in timeline] + [t["end"] for t in timeline]
-    t_min = min(all_times)
-    t_max = max(all_times)
-    t_range = max(t_max - t_min, 1)
-
-    # Color map
-    colors = {"PASS": "#22c55e", "FAIL": "#ef4444", "SKIP": "#eab308"}
-
-    # Build Gantt bars
-    gantt_bars = []
-    for t in timeline:
-        left_pct = ((t["start"] - t_min) / t_range) * 100
-        width_pct = max(((t["end"] - t["start"]) / t_range) * 100, 0.5)
-        color = colors.get(t["result"], "#6b7280")
-        gantt_bars.append(f"""
+def gantt_row(t: TimelineEntry, t_min: float, pct_per_second: float) -> str:
+    """Render one test as a bar on the timeline."""
+    left_pct = (t.start - t_min) * pct_per_second
+    width_pct = max((t.end - t.start) * pct_per_second, 0.5)
+    color = RESULT_COLORS[t.result_idx]
+    duration = format_duration(t.duration)
+    return f"""
         <div class="gantt-row">
-            <div class="gantt-label">{t['id']}</div>
+            <div class="gantt-label">{t.id}</div>
             <div class="gantt-track">
                 <div class="gantt-bar" style="left:{left_pct:.2f}%;width:{width_pct:.2f}%;background:{color}"
-                     title="{t['id']}: {format_duration(t['duration'])} ({t['result']})">
-                    {format_duration(t['duration'])}
+                     title="{t.id}: {duration} ({t.result})">
+                    {duration}
                 </div>
             </div>
-        </div>""")
+        </div>"""
 
-    # Build test results table
-    test_rows = []
-    for t in timeline:
-        badge = f'<span class="badge" style="background:{colors.get(t["result"], "#6b7280")}">{t["result"]}</span>'
-        test_rows.append(f"""
-        <tr>
-            <td>{t['id']}</td>
-            <td>Tier {t['tier']}</td>
-            <td>{badge}</td>
-            <td>{format_duration(t['duration'])}</td>
-        </tr>""")
-
-    # Build data plane table
-    dp_rows = []
-    for m in data_metrics:
-        dp_rows.append(f"""
-        <tr>
-            <td>{m['type']}</td>
-            <td>{m['name']}</td>
-            <td>Tier {m['tier']}</td>
-            <td>{m.get('result', m.get('mbps', '-'))}</td>
-            <td>{m.get('size_mb', m.get('payload', m.get('duration', '-')))}</td>
-        </tr>""")
-
-    # Build tier summary
-    tier_rows = []
-    for t in tiers:
-        tier_rows.append(f"""
+
+def test_row(t: TimelineEntry) -> str:
+    """Render one row of the test results table."""
+    color = RESULT_COLORS[t.result_idx]
+    return f"""
         <tr>
-            <td>{t['name']}</td>
-            <td>{t['tests']}</td>
-            <td>{format_duration(t['duration'])}</td>
-        </tr>""")
-
-    # Chaos events log
-    chaos_rows = []
-    for c in chaos:
-        rel_time = format_duration(c["ts"] - t_min)
-        chaos_rows.append(f"""
+            <td>{t.id}</td>
+            <td>Tier {t.tier}</td>
+            <td><span class="badge" style="background:{color}">{t.result}</span></td>
+            <td>{format_duration(t.duration)}</td>
+        </tr>"""
+
+
+def data_plane_row(m: MetricEntry) -> str:
+    """Render one row of the data plane metrics table."""
+    return f"""
         <tr>
-            <td>{rel_time}</td>
-            <td>Tier {c['tier']}</td>
-            <td>{c['type']}</td>
-            <td>{c['node']}</td>
-            <td>{c.get('params', '')}</td>
-        </tr>""")
+            <td>{m.type}</td>
+            <td>{m.name}</td>
+            <td>Tier {m.tier}</td>
+            <td>{m.result}</td>
+            <td>{m.detail}</td>
+        </tr>"""
 
-    # Stats
-    total = len(timeline)
-    passed = sum(1 for t in timeline if t["result"] == "PASS")
-    failed = sum(1 for t in timeline if t["result"] == "FAIL")
-    skipped = sum(1 for t in timeline if t["result"] == "SKIP")
-    total_duration = format_duration(t_range)
 
-    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+def tier_row(t: TierEntry) -> str:
+    """Render one row of the tier summary table."""
+    return f"""
+        <tr>
+            <td>{t.name}</td>
+            <td>{t.tests}</td>
+            <td>{format_duration(t.duration)}</td>
+        </tr>"""
+
 
-    return f"""<!DOCTYPE html>
+def chaos_row(c: ChaosEntry, t_min: float) -> str:
+    """Render one row of the chaos events log."""
+    return f"""
+        <tr>
+            <td>{format_duration(c.ts - t_min)}</td>
+            <td>Tier {c.tier}</td>
+            <td>{c.type}</td>
+            <td>{c.node}</td>
+            <td>{c.params}</td>
+        </tr>"""
+
+
+def table_or_empty(
+    header: str, entries: list, row: Callable[..., str], empty: str
+) -> Iterator[str]:
+    """Yield the fragments of a table section, or its empty-state note."""
+    if not entries:
+        yield f'<p class="empty">{empty}</p>'
+        return
+    yield header
+    yield from map(row, entries)
+    yield "</table>"
+
+
+# The static start of the report: document head and stylesheet.
+HTML_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width, initial-scale=1">
 <title>wgmesh Integration Test Report</title>
 <style>
-    * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-    body {{ font-family: -apple-system, system-ui, sans-serif; background: #0f172a; color: #e2e8f0; padding: 2rem; }}
-    h1 {{ color: #f1f5f9; margin-bottom: 0.5rem; }}
-    h2 {{ color: #94a3b8; margin: 2rem 0 1rem; border-bottom: 1px solid #334155; padding-bottom: 0.5rem; }}
-    .stats {{ display: flex; gap: 1.5rem; margin: 1rem 0 2rem; flex-wrap: wrap; }}
-    .stat {{ background: #1e293b; padding: 1rem 1.5rem; border-radius: 8px; min-width: 120px; }}
-    .stat-value {{ font-size: 2rem; font-weight: 700; }}
-    .stat-label {{ color: #94a3b8; font-size: 0.85rem; }}
-    .pass {{ color: #22c55e; }}
-    .fail {{ color: #ef4444; }}
-    .skip {{ color: #eab308; }}
-    table {{ width: 100%; border-collapse: collapse; background: #1e293b; border-radius: 8px; overflow: hidden; margin-bottom: 1rem; }}
-    th {{ background: #334155; padding: 0.75rem 1rem; text-align: left; font-size: 0.85rem; color: #94a3b8; }}
-    td {{ padding: 0.5rem 1rem; border-top: 1px solid #334155; font-size: 0.9rem; }}
-    tr:hover {{ background: #334155; }}
-    .badge {{ padding: 2px 8px; border-radius: 4px; color: white; font-size: 0.8rem; font-weight: 600; }}
-    .gantt-row {{ display: flex; align-items: center; margin: 2px 0; }}
-    .gantt-label {{ width: 80px; font-size: 0.8rem; color: #94a3b8; text-align: right; padding-right: 8px; flex-shrink: 0; }}
-    .gantt-track {{ flex: 1; height: 24px; background: #1e293b; border-radius: 4px; position: relative; overflow: hidden; }}
-    .gantt-bar {{ position: absolute; height: 100%; border-radius: 4px; display: flex; align-items: center; padding: 0 6px;
-                  font-size: 0.7rem; color: white; white-space: nowrap; overflow: hidden; min-width: 4px; }}
-    .footer {{ margin-top: 3rem; color: #475569; font-size: 0.8rem; text-align: center; }}
-    .section {{ margin-bottom: 2rem; }}
-    .empty {{ color: #64748b; font-style: italic; padding: 1rem; }}
+    * { margin: 0; padding: 0; box-sizing: border-box; }
+    body { font-family: -apple-system, system-ui, sans-serif; background: #0f172a; color: #e2e8f0; padding: 2rem; }
+    h1 { color: #f1f5f9; margin-bottom: 0.5rem; }
+    h2 { color: #94a3b8; margin: 2rem 0 1rem; border-bottom: 1px solid #334155; padding-bottom: 0.5rem; }
+    .stats { display: flex; gap: 1.5rem; margin: 1rem 0 2rem; flex-wrap: wrap; }
+    .stat { background: #1e293b; padding: 1rem 1.5rem; border-radius: 8px; min-width: 120px; }
+    .stat-value { font-size: 2rem; font-weight: 700; }
+    .stat-label { color: #94a3b8; font-size: 0.85rem; }
+    .pass { color: #22c55e; }
+    .fail { color: #ef4444; }
+    .skip { color: #eab308; }
+    table { width: 100%; border-collapse: collapse; background: #1e293b; border-radius: 8px; overflow: hidden; margin-bottom: 1rem; }
+    th { background: #334155; padding: 0.75rem 1rem; text-align: left; font-size: 0.85rem; color: #94a3b8; }
+    td { padding: 0.5rem 1rem; border-top: 1px solid #334155; font-size: 0.9rem; }
+    tr:hover { background: #334155; }
+    .badge { padding: 2px 8px; border-radius: 4px; color: white; font-size: 0.8rem; font-weight: 600; }
+    .gantt-row { display: flex; align-items: center; margin: 2px 0; }
+    .gantt-label { width: 80px; font-size: 0.8rem; color: #94a3b8; text-align: right; padding-right: 8px; flex-shrink: 0; }
+    .gantt-track { flex: 1; height: 24px; background: #1e293b; border-radius: 4px; position: relative; overflow: hidden; }
+    .gantt-bar { position: absolute; height: 100%; border-radius: 4px; display: flex; align-items: center; padding: 0 6px;
+                  font-size: 0.7rem; color: white; white-space: nowrap; overflow: hidden; min-width: 4px; }
+    .footer { margin-top: 3rem; color: #475569; font-size: 0.8rem; text-align: center; }
+    .section { margin-bottom: 2rem; }
+    .empty { color: #64748b; font-style: italic; padding: 1rem; }
 </style>
 </head>
 <body>
 <h1>wgmesh Integration Test Report</h1>
-<p style="color:#64748b">Generated: {generated}</p>
+"""
+
+HTML_TAIL = """
+</div>
+</body>
+</html>"""
+
+
+def generate_html(events: list[Event]) -> Iterator[str]:
+    """Generate self-contained HTML report as fragments to write in order.
+
+    Rows are rendered as the fragments are consumed, so the report is
+    streamed to its writer and never held in memory as a whole.
+    """
+    # Each test_end makes a timeline entry. Aborted runs often have none,
+    # and are told apart with this scan, which stops at the first test_end
+    # of a normal trace, rather than by escaping all their other events.
+    if not any(ev.type == "test_end" for ev in events):
+        yield "<html><body><h1>No test events found</h1></body></html>"
+        return
+
+    (
+        timeline, chaos, data_metrics, tiers, result_counts, t_min, t_max
+    ) = bucket_events(events)
+
+    # Global time range
+    t_range = max(t_max - t_min, 1)
+
+    # Stats
+    total = len(timeline)
+    passed, failed, skipped = result_counts[:OTHER_RESULT]
+    total_duration = format_duration(t_range)
+
+    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+    yield HTML_HEAD
+    yield f"""<p style="color:#64748b">Generated: {generated}</p>
 
 <div class="stats">
     <div class="stat"><div class="stat-value">{total}</div><div class="stat-label">Total Tests</div></div>
@@ -258,37 +443,68 @@ def generate_html(events: list[dict]) -> str:
 
 <div class="section">
 <h2>Test Timeline</h2>
-{''.join(gantt_bars) if gantt_bars else '<p class="empty">No timing data</p>'}
+"""
+
+    pct_per_second = 100 / t_range
+    for t in timeline:
+        yield gantt_row(t, t_min, pct_per_second)
+
+    yield """
 </div>
 
 <div class="section">
 <h2>Tier Summary</h2>
-{'<table><tr><th>Tier</th><th>Tests</th><th>Duration</th></tr>' + ''.join(tier_rows) + '</table>' if tier_rows else '<p class="empty">No tier data</p>'}
+"""
+    yield from table_or_empty(
+        "<table><tr><th>Tier</th><th>Tests</th><th>Duration</th></tr>",
+        tiers,
+        tier_row,
+        "No tier data",
+    )
+
+    yield """
 </div>
 
 <div class="section">
 <h2>Test Results</h2>
 <table>
 <tr><th>ID</th><th>Tier</th><th>Result</th><th>Duration</th></tr>
-{''.join(test_rows)}
+"""
+    yield from map(test_row, timeline)
+
+    yield """
 </table>
 </div>
 
 <div class="section">
 <h2>Data Plane Metrics</h2>
-{'<table><tr><th>Type</th><th>Pair</th><th>Tier</th><th>Result</th><th>Detail</th></tr>' + ''.join(dp_rows) + '</table>' if dp_rows else '<p class="empty">No data plane events</p>'}
+"""
+    yield from table_or_empty(
+        "<table><tr><th>Type</th><th>Pair</th><th>Tier</th><th>Result</th><th>Detail</th></tr>",
+        data_metrics,
+        data_plane_row,
+        "No data plane events",
+    )
+
+    yield f"""
 </div>
 
 <div class="section">
 <h2>Chaos Events ({len(chaos)})</h2>
-{'<table><tr><th>Time</th><th>Tier</th><th>Action</th><th>Node</th><th>Params</th></tr>' + ''.join(chaos_rows) + '</table>' if chaos_rows else '<p class="empty">No chaos events</p>'}
+"""
+    yield from table_or_empty(
+        "<table><tr><th>Time</th><th>Tier</th><th>Action</th><th>Node</th><th>Params</th></tr>",
+        chaos,
+        functools.partial(chaos_row, t_min=t_min),
+        "No chaos events",
+    )
+
+    yield f"""
 </div>
 
 <div class="footer">
-    wgmesh integration test observability &middot; {len(events)} trace events
-</div>
-</body>
-</html>"""
+    wgmesh integration test observability &middot; {len(events)} trace events"""
+    yield HTML_TAIL
 
 
 def main():
@@ -304,12 +520,38 @@ def main():
         print(f"Trace file not found: {trace_path}", file=sys.stderr)
         sys.exit(1)
 
+    # Events and report rows never form reference cycles, so the cycle
+    # collector would only keep rescanning them; refcounting frees all.
+    # PyPy has no refcounting: its gc is the only collector, so keep it.
+    if sys.implementation.name == "cpython":
+        gc.disable()
+
     events = load_events(trace_path)
     if not events:
         print("Warning: no events found in trace file", file=sys.stderr)
 
-    html = generate_html(events)
-    Path(output_path).write_text(html)
+    # The report streams into a temporary file beside the output and is
+    # renamed over it once complete, so a failed run leaves any previous
+    # report in place. It declares charset=utf-8, whatever the locale
+    # encoding is; the text layer encodes the buffered fragments in bulk,
+    # which beats encoding each fragment to bytes here.
+    output = Path(output_path)
+    tmp = tempfile.NamedTemporaryFile(
+        "w",
+        encoding="utf-8",
+        buffering=1 << 20,
+        dir=output.parent,
+        prefix=f".{output.name}.",
+        delete=False,
+    )
+    try:
+        with tmp as f:
+            f.writelines(generate_html(events))
+        os.chmod(tmp.name, 0o644)  # the temporary file is created 0600
+        os.replace(tmp.name, output)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
     print(f"Report generated: {output_path} ({len(events)} events)")
 
 